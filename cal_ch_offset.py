@@ -1,6 +1,177 @@
+import functools
 import numpy as np
-from shapely.geometry import LineString, Point
-from scipy.spatial import KDTree
+import pandas as pd
+from csv_to_polyline import PolylineIndex
+
+# Nearest segment samples checked per survey point, the first try and the most tried before
+# falling back to a full scan of all segments
+_CANDIDATE_SEGMENTS = 8
+_MAX_CANDIDATE_SEGMENTS = 512
+
+# Upper bound on survey points x polyline segments handled per NumPy block
+_BLOCK_ROWS = 4096
+_BLOCK_ELEMENTS = 1 << 20
+
+
+def _side(seg_vec, d):
+    """ -1 for points right of their segment (in polyline direction), +1 otherwise """
+    return np.where(seg_vec[..., 0] * d[..., 1] - seg_vec[..., 1] * d[..., 0] < 0, -1.0, 1.0)
+
+
+def _project_onto_segments(points, seg_start, seg_vec, seg_len2, seg_len, cum_len):
+    """ Project points onto the nearest polyline segment, returns (chainage, signed offset) """
+    n_points = len(points)
+    rows = np.arange(n_points)
+
+    # Degenerate (zero length) segments project onto their start point
+    safe_len2 = np.where(seg_len2 > 0, seg_len2, 1.0)
+
+    # Position of the foot point along each segment, clamped to the segment
+    d = points[:, None, :] - seg_start[None, :, :]
+    t = np.clip(np.einsum("nsk,sk->ns", d, seg_vec) / safe_len2, 0, 1)
+
+    # Squared distance to the foot point on every segment, keep the closest
+    foot_d = d - t[..., None] * seg_vec
+    dist2 = np.einsum("nsk,nsk->ns", foot_d, foot_d)
+    seg_idx = dist2.argmin(1)
+
+    chainage = cum_len[seg_idx] + t[rows, seg_idx] * seg_len[seg_idx]
+    offset = np.sqrt(dist2[rows, seg_idx]) * _side(seg_vec[seg_idx], d[rows, seg_idx])
+    return chainage, offset
+
+
+def _project_in_blocks(points, seg_start, seg_vec, seg_len2, seg_len, cum_len):
+    """ Run the NumPy projection in blocks to bound the points x segments arrays """
+    block = max(1, min(_BLOCK_ROWS, _BLOCK_ELEMENTS // len(seg_start)))
+    chainage = np.empty(len(points))
+    offset = np.empty(len(points))
+    for start in range(0, len(points), block):
+        stop = start + block
+        chainage[start:stop], offset[start:stop] = _project_onto_segments(
+            points[start:stop], seg_start, seg_vec, seg_len2, seg_len, cum_len
+        )
+    return chainage, offset
+
+
+@functools.lru_cache(maxsize=None)
+def _chainage_offset_kernel():
+    """ Compiles the numba projection kernel on first use, None when numba is not installed """
+    try:
+        from numba import njit, prange
+    except ImportError:  # numba is optional, fall back to the NumPy projection
+        return None
+
+    # fastmath without the no-NaN/no-inf assumptions, the kernel relies on both, and without
+    # contract: fused multiply-adds round differently from the NumPy paths, which changes the
+    # segment (and offset side) picked when two segments tie at a shared vertex
+    @njit(cache=True, parallel=True, fastmath={"nsz", "arcp", "reassoc"})
+    def chainage_offset_kernel(q_x, q_y, seg_x, seg_y, seg_dx, seg_dy, seg_len2, seg_len, cum_len):
+        """ Compiled nearest-segment projection, returns (chainage, signed offset) """
+        n_points = q_x.shape[0]
+        chainage = np.full(n_points, np.nan)
+        offset = np.full(n_points, np.nan)
+
+        for i in prange(n_points):
+            best_dist2 = np.inf
+            best_seg = -1
+            best_t = 0.0
+            best_cross = 0.0
+
+            for j in range(seg_x.shape[0]):
+                dx = q_x[i] - seg_x[j]
+                dy = q_y[i] - seg_y[j]
+                t = 0.0
+                if seg_len2[j] > 0:
+                    t = min(max((dx * seg_dx[j] + dy * seg_dy[j]) / seg_len2[j], 0.0), 1.0)
+                fx = dx - t * seg_dx[j]
+                fy = dy - t * seg_dy[j]
+                dist2 = fx * fx + fy * fy
+                if dist2 < best_dist2:
+                    best_dist2 = dist2
+                    best_seg = j
+                    best_t = t
+                    best_cross = seg_dx[j] * dy - seg_dy[j] * dx
+
+            if best_seg >= 0:
+                chainage[i] = cum_len[best_seg] + best_t * seg_len[best_seg]
+                offset[i] = np.sqrt(best_dist2) * (-1.0 if best_cross < 0 else 1.0)
+
+        return chainage, offset
+
+    return chainage_offset_kernel
+
+
+def _project_all_segments(points, index):
+    """ Project points onto the nearest of all polyline segments, returns (chainage, signed offset) """
+    chainage_offset_kernel = _chainage_offset_kernel()
+    if chainage_offset_kernel is not None:
+        return chainage_offset_kernel(
+            np.ascontiguousarray(points[:, 0]), np.ascontiguousarray(points[:, 1]),
+            np.ascontiguousarray(index.seg_start[:, 0]), np.ascontiguousarray(index.seg_start[:, 1]),
+            np.ascontiguousarray(index.seg_vec[:, 0]), np.ascontiguousarray(index.seg_vec[:, 1]),
+            index.seg_len2, index.seg_len, index.cum_len
+        )
+    return _project_in_blocks(points, index.seg_start, index.seg_vec, index.seg_len2, index.seg_len, index.cum_len)
+
+
+def _project_candidates(points, index, k):
+    """ Project points onto the segments of their k nearest samples, returns (chainage, signed offset, exact) """
+    n_samples = len(index.sample_seg)
+    k = min(k, n_samples)
+    sample_dist, samples = index.kdtree.query(points, k=[*range(1, k + 1)], workers=-1)
+    rows = np.arange(len(points))
+
+    # Keep the candidates in polyline order, so ties at a shared vertex resolve to the
+    # first segment (and offset side) like they do in the full scan
+    candidates = index.sample_seg[samples]
+    candidates.sort(axis=1)
+
+    # Same projection as _project_onto_segments, on k candidates per point
+    seg_start = index.seg_start[candidates]
+    seg_vec = index.seg_vec[candidates]
+    seg_len2 = index.seg_len2[candidates]
+    d = points[:, None, :] - seg_start
+    t = np.clip(np.einsum("nkd,nkd->nk", d, seg_vec) / np.where(seg_len2 > 0, seg_len2, 1.0), 0, 1)
+    foot_d = d - t[..., None] * seg_vec
+    dist2 = np.einsum("nkd,nkd->nk", foot_d, foot_d)
+    best = dist2.argmin(1)
+    seg_idx = candidates[rows, best]
+
+    chainage = index.cum_len[seg_idx] + t[rows, best] * index.seg_len[seg_idx]
+    distance = np.sqrt(dist2[rows, best])
+    offset = distance * _side(seg_vec[rows, best], d[rows, best])
+
+    # Every part of a segment is within half the sample spacing of one of its samples, so a
+    # segment without a sample among the k nearest is at least (k-th sample distance - half the
+    # spacing) away. The result is exact when no such segment can be closer
+    if k == n_samples:
+        exact = np.ones(len(points), dtype=bool)
+    else:
+        exact = distance <= sample_dist[:, -1] - index.sample_spacing / 2
+    return chainage, offset, exact
+
+
+def _project_points(points, index):
+    """ Project points onto the nearest polyline segment, returns (chainage, signed offset) """
+    chainage = np.empty(len(points))
+    offset = np.empty(len(points))
+
+    # Check the nearest candidate segments first and widen the search for the points where
+    # that is not conclusive, scan all segments only for what is left after that
+    pending = np.arange(len(points))
+    k = _CANDIDATE_SEGMENTS
+    while len(pending) and k <= _MAX_CANDIDATE_SEGMENTS:
+        # In blocks, the candidate arrays are points x k
+        block = max(1, _BLOCK_ELEMENTS // k)
+        exact = np.empty(len(pending), dtype=bool)
+        for start in range(0, len(pending), block):
+            rows = pending[start:start + block]
+            chainage[rows], offset[rows], exact[start:start + block] = _project_candidates(points[rows], index, k)
+        pending = pending[~exact]
+        k *= 4
+    if len(pending):
+        chainage[pending], offset[pending] = _project_all_segments(points[pending], index)
+    return chainage, offset
 
 
 def calculate_chainage_offset(survey_df, polyline):
@@ -11,36 +182,26 @@ def calculate_chainage_offset(survey_df, polyline):
     if not required_columns.issubset(survey_df.columns):
         raise ValueError(f"Survey CSV must contain {required_columns} columns")
 
-    if (isinstance(survey_df["Easting"].iloc[0], str) and
-            survey_df["Easting"].iloc[0] == "Easting"):
-        # Skip the header row
-        survey_df = survey_df.iloc[1:].reset_index(drop=True)
-
-    # Convert polyline into coordinate list and create KDTree for fast searching
-    polyline_points = np.array(polyline.coords)
-    polyline_tree = KDTree(polyline_points)
-
-    chainage_list = []
-    offset_list = []
-
-    for _, row in survey_df.iterrows():
-        survey_point = Point(row["Easting"], row["Northing"])
-
-        # Find nearest point on polyline
-        _, nearest_index = polyline_tree.query([survey_point.x, survey_point.y])
-        nearest_point = Point(polyline_points[nearest_index])
+    # Convert the coordinates once to float64 arrays, unparsable values
+    # (including a stray header row, callers already skip it) become NaN
+    easting = pd.to_numeric(survey_df["Easting"], errors="coerce").to_numpy(dtype=np.float64)
+    northing = pd.to_numeric(survey_df["Northing"], errors="coerce").to_numpy(dtype=np.float64)
 
-        # Compute accurate chainage using project() function
-        chainage = round(polyline.project(nearest_point), 3)
+    # Reuse the precomputed segment geometry when given a PolylineIndex
+    if not isinstance(polyline, PolylineIndex):
+        polyline = PolylineIndex.from_polyline(polyline)
 
-        # Compute perpendicular offset distance
-        offset = round(survey_point.distance(nearest_point), 3)
+    chainages = np.full(len(easting), np.nan)
+    offsets = np.full(len(easting), np.nan)
+    valid = np.isfinite(easting) & np.isfinite(northing)
+    survey_points = np.column_stack([easting[valid], northing[valid]])
 
-        chainage_list.append(chainage)
-        offset_list.append(offset)
+    # Offsets are signed, positive left of the polyline and negative right of it (looking
+    # along increasing chainage)
+    chainages[valid], offsets[valid] = _project_points(survey_points, polyline)
 
     # Add calculated values to DataFrame
-    survey_df["Chainage"] = chainage_list
-    survey_df["Offset"] = offset_list
+    survey_df["Chainage"] = np.round(chainages, 3)
+    survey_df["Offset"] = np.round(offsets, 3)
 
     return survey_df
@@ -1,297 +1,426 @@
 import os
 import time
+import functools
+import multiprocessing
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer, Paragraph
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Spacer, Paragraph
 from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.platypus import PageTemplate, Frame
 from reportlab.pdfgen import canvas
-from csv_to_polyline import data_to_polyline
+from csv_to_polyline import data_to_polyline_index
 from cal_ch_offset import calculate_chainage_offset
 
 
 def format_feature_name(features):
-    """ Converts feature pairs into formatted string, ensuring proper structure. """
-    feature_list = []
-
-    for i in range(0, len(features), 2):
-        feature_key = features[i]
-        feature_value = features[i + 1] if i + 1 < len(features) else "NA"
-
-        # Skip "NA=NA" pairs
-        if feature_key == "NA" and feature_value == "NA":
-            continue
-
-        formatted_feature = f"{feature_key}={feature_value}"
-        feature_list.append(formatted_feature)
+    """ Converts a block of feature pair columns into formatted strings, ensuring proper structure. """
+    if features.shape[1] == 0:
+        return pd.Series("NA", index=features.index, dtype="string[pyarrow]")
+
+    # Pair up the columns as (rows, pairs, key/value), a trailing key without value gets "NA"
+    values = features.to_numpy(dtype=object)
+    if values.shape[1] % 2:
+        values = np.column_stack([values, np.full(len(values), "NA", dtype=object)])
+    pairs = values.reshape(len(values), values.shape[1] // 2, 2)
+    keys, pair_values = pairs[:, :, 0], pairs[:, :, 1]
+
+    # Format all pairs at once, "NA=NA" pairs become empty
+    formatted = np.where((keys == "NA") & (pair_values == "NA"), "", keys + "=" + pair_values)
+
+    # Join the pairs of each row with "/", skipping the empty ones
+    joined = formatted[:, 0]
+    for pair in formatted.T[1:]:
+        joined = np.where(pair == "", joined, np.where(joined == "", pair, joined + "/" + pair))
+    feature_name = pd.Series(joined, index=features.index, dtype="string[pyarrow]")
 
     # Remove empty "/" cases
-    feature_name = "/".join(feature_list).strip("/")
-
-    return feature_name if feature_name else "NA"  # Ensure empty values return "NA"
-
-
-def extract_value(feature_value):
-    """ Extracts the part after ':' if exists, else returns original value. """
-    if pd.isna(feature_value) or feature_value in ["nan", "NaN", "NAN"]:  # Replace missing values
-        return "NA"
-    return feature_value.split(":")[-1].strip() if ":" in feature_value else feature_value
-
-
-# Custom canvas for header and footer
-class MyCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
-        self.report_info = kwargs.pop('report_info', {})
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self.pages = []
-        self.width, self.height = landscape(A4)
-
-    def showPage(self):
-        self.pages.append(dict(self.__dict__))
-        self._startPage()
-
+    feature_name = feature_name.str.strip("/")
+
+    return feature_name.where(feature_name.ne(""), "NA")  # Ensure empty values return "NA"
+
+
+def extract_value(feature_values):
+    """ Extracts the part after the last ':' for a column of values, else keeps the original value. """
+    # Missing values are already "NA", see prepare_report_data
+    # One regex pass finds the text after the last ':', it is NA for values without one
+    tail = feature_values.str.extract(r":([^:]*)$", expand=False)
+    return feature_values.where(tail.isna(), tail.str.strip())
+
+
+# Style for table cells that need wrapping
+_WRAP_STYLE = ParagraphStyle(
+    name="WrapStyle",
+    fontSize=9,
+    leading=12,
+    spaceBefore=1,
+    spaceAfter=1
+)
+
+PAGE_COUNT_FORM = "page_count"
+
+PAGE_SIZE = landscape(A4)
+
+# Header columns (divide usable width into 5 equal columns)
+_HEADER_LEFT_MARGIN = 40
+_HEADER_COL_WIDTH = (PAGE_SIZE[0] - (_HEADER_LEFT_MARGIN * 2)) / 5
+_HEADER_COLUMNS = tuple(_HEADER_LEFT_MARGIN + (_HEADER_COL_WIDTH * i) for i in range(5))
+
+# Footer page number position, wide enough for "Page 9999 of 9999"
+_PAGE_NUMBER_X = PAGE_SIZE[0] - 40 - stringWidth("Page 0000 of 0000", "Helvetica", 9)
+
+# Column widths for landscape
+COL_WIDTHS = [0.8 * inch, 1.0 * inch, 1.0 * inch, 0.9 * inch, 1.1 * inch, 1.0 * inch, 1.0 * inch, 4.3 * inch]
+
+_ALT_ROW_COLOR = colors.HexColor("#f5f5f5")
+
+# Table styles, the same for every report
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#003366")),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
+    ('TOPPADDING', (0, 1), (-1, -1), 5),
+    ('WORDWRAP', (4, 1), (7, -1)),
+    ('FONTSIZE', (4, 1), (4, -1), 9),
+    ('LEADING', (4, 1), (4, -1), 12),
+    ('FONTSIZE', (7, 1), (7, -1), 9),
+    ('LEADING', (7, 1), (7, -1), 12),
+] + [('ALIGN', (i, 1), (i, -1), 'RIGHT') for i in [0, 1, 2, 3, 5, 6]] + [
+    ('ALIGN', (4, 1), (4, -1), 'LEFT'),
+    ('ALIGN', (7, 1), (7, -1), 'LEFT'),
+])
+
+
+def wrap_cell(text, col_width):
+    """ Wraps text in a Paragraph only if it does not fit its column. """
+    # Cells have 8pt of padding on each side
+    if stringWidth(text, _WRAP_STYLE.fontName, _WRAP_STYLE.fontSize) <= col_width - 16:
+        return text
+    # Escaped so the text shows literally, the same as in a plain string cell
+    return Paragraph(escape(text), _WRAP_STYLE)
+
+
+# Custom canvas for the total page count in the footer
+class PageCountCanvas(canvas.Canvas):
     def save(self):
-        page_count = len(self.pages)
-        for page in self.pages:
-            self.__dict__.update(page)
-            self.draw_header_footer(page_count)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def draw_header_footer(self, page_count):
-        page = self._pageNumber
-        self.saveState()
-
-        # Header height calculation
-        header_height = 140  # Increased for more space
-
-        # Background for header
-        self.setFillColor(colors.HexColor("#f9f9f9"))
-        self.rect(20, self.height - header_height, self.width - 40, 90, fill=1, stroke=0)
-
-        # Decorative element
-        self.setFillColor(colors.HexColor("#003366"))
-        self.rect(20, self.height - header_height, 10, 90, fill=1, stroke=0)
-
-        # Company Name
-        self.setFillColor(colors.HexColor("#003366"))
-        self.setFont("Helvetica-Bold", 18)
-        self.drawString(40, self.height - 40, "Navvis Geomatics")
-
-        # Title
-        self.setFont("Helvetica-Bold", 22)
-        self.drawString(40, self.height - 70, "Point Report")
-
-        # Calculate column positions (divide usable width into 5 equal columns)
-        left_margin = 40
-        col_width = (self.width - (left_margin * 2)) / 5
-
-        # Define columns
-        col1 = left_margin
-        col2 = left_margin + col_width
-        col3 = left_margin + (col_width * 2)
-        col4 = left_margin + (col_width * 3)
-        col5 = left_margin + (col_width * 4)
-
-        # Base y position
-        y_pos = self.height - 100
-
-        # Second column - Project info
-        self.setFont("Helvetica-Bold", 11)
-        self.setFillColor(colors.HexColor("#003366"))
-        self.drawString(col2, y_pos + 15, "Project Information")
-        self.setFillColor(colors.black)
-        self.setFont("Helvetica", 10)
-        self.drawString(col2, y_pos, f"Project: {self.report_info.get('Project', '')}")
-        self.drawString(col2, y_pos - 15, f"Spread: {self.report_info.get('Spread', '')}")
-        self.drawString(col2, y_pos - 30, f"File: {self.report_info.get('File', '')}")
-
-        # Third column - Base point info
-        self.setFont("Helvetica-Bold", 11)
-        self.setFillColor(colors.HexColor("#003366"))
-        self.drawString(col3, y_pos + 15, "Base Point Information")
-        self.setFillColor(colors.black)
-        self.setFont("Helvetica", 10)
-        self.drawString(col3, y_pos, f"Base Point: {self.report_info.get('Base Point', '')}")
-        self.drawString(col3, y_pos - 15, f"Point Number:")
-
-        # Fourth column - Control check
-        self.setFont("Helvetica-Bold", 11)
-        self.setFillColor(colors.HexColor("#003366"))
-        self.drawString(col4, y_pos + 15, "Control Check")
-        self.setFillColor(colors.black)
-        self.setFont("Helvetica", 10)
-        self.drawString(col4, y_pos, f"Control check:")
-        self.drawString(col4, y_pos - 15, f"Point Number: 5960890")
-
-        # Fifth column - Additional info
-        self.setFont("Helvetica-Bold", 11)
-        self.setFillColor(colors.HexColor("#003366"))
-        self.drawString(col5, y_pos + 15, "Code Information")
-        self.setFillColor(colors.black)
-        self.setFont("Helvetica", 10)
-        self.drawString(col5, y_pos, f"{self.report_info.get('Point Number', '214 codes')}")
-        self.drawString(col5, y_pos - 15, f"{self.report_info.get('Control check', '0 Not entered')}")
-        self.drawString(col5, y_pos - 30, f"Score: {self.report_info.get('Score', '100.00%')}")
-
-        # Add a line below the header
-        self.setStrokeColor(colors.HexColor("#003366"))
-        self.setLineWidth(2)
-        self.line(40, y_pos - 45, self.width - 40, y_pos - 45)
-
-        # Footer with page number
+        # Define the form every footer refers to, now that the page count is known
+        page_count = self.getPageNumber() - 1
+        self.beginForm(PAGE_COUNT_FORM)
         self.setFont("Helvetica", 9)
         self.setFillColor(colors.HexColor("#003366"))
-        self.drawRightString(self.width - 40, 20, f"Page {page} of {page_count}")
-
-        # Add timestamp to footer
-        self.setFont("Helvetica", 8)
-        self.setFillColor(colors.grey)
-        footer_text = f"Generated on: {time.strftime('%Y-%m-%d %H:%M:%S')}"
-        self.drawString(40, 20, footer_text)
-
-        self.restoreState()
-
-
-def csv_to_pdf(csv_file, chainages, output_folder=None, report_info=None):
-    # Default report information if not provided
-    if report_info is None:
-        report_info = {
-            "Project": "Project Name",
-            "Spread": "Spread Info",
-            "File": os.path.basename(csv_file),
-            "Base Point": "Base Point Info",
-            "Point Number": "214 codes",
-            "Control check": "0 Not entered",
-            "Score": "100.00%"
-        }
-
-    # Ensure output directory exists
-    if output_folder is None:
-        output_folder = os.path.join(os.path.dirname(csv_file), '..', 'output', 'pdf')
-
-    os.makedirs(output_folder, exist_ok=True)
+        self.drawString(0, 0, str(page_count))
+        self.endForm()
+        canvas.Canvas.save(self)
 
-    timestamp = time.strftime("%Y%m%d-%H%M%S")
-    output_pdf = os.path.join(output_folder, f"Survey_Report_{timestamp}.pdf")
 
+def header_texts(report_info):
+    """ Formats the header and footer texts once per report, they are the same on every page. """
+    return {
+        "Project": f"Project: {report_info.get('Project', '')}",
+        "Spread": f"Spread: {report_info.get('Spread', '')}",
+        "File": f"File: {report_info.get('File', '')}",
+        "Base Point": f"Base Point: {report_info.get('Base Point', '')}",
+        "Point Number": f"{report_info.get('Point Number', '214 codes')}",
+        "Control check": f"{report_info.get('Control check', '0 Not entered')}",
+        "Score": f"Score: {report_info.get('Score', '100.00%')}",
+        "Generated on": f"Generated on: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+    }
+
+
+def draw_header_footer(canv, doc, texts):
+    """ Draws the report header and footer (texts from header_texts) on the current page. """
+    page = canv.getPageNumber()
+    width, height = PAGE_SIZE
+    canv.saveState()
+
+    # Header height calculation
+    header_height = 140  # Increased for more space
+
+    # Background for header
+    canv.setFillColor(colors.HexColor("#f9f9f9"))
+    canv.rect(20, height - header_height, width - 40, 90, fill=1, stroke=0)
+
+    # Decorative element
+    canv.setFillColor(colors.HexColor("#003366"))
+    canv.rect(20, height - header_height, 10, 90, fill=1, stroke=0)
+
+    # Company Name
+    canv.setFillColor(colors.HexColor("#003366"))
+    canv.setFont("Helvetica-Bold", 18)
+    canv.drawString(40, height - 40, "Navvis Geomatics")
+
+    # Title
+    canv.setFont("Helvetica-Bold", 22)
+    canv.drawString(40, height - 70, "Point Report")
+
+    # Column positions
+    col1, col2, col3, col4, col5 = _HEADER_COLUMNS
+
+    # Base y position
+    y_pos = height - 100
+
+    # Second column - Project info
+    canv.setFont("Helvetica-Bold", 11)
+    canv.setFillColor(colors.HexColor("#003366"))
+    canv.drawString(col2, y_pos + 15, "Project Information")
+    canv.setFillColor(colors.black)
+    canv.setFont("Helvetica", 10)
+    canv.drawString(col2, y_pos, texts["Project"])
+    canv.drawString(col2, y_pos - 15, texts["Spread"])
+    canv.drawString(col2, y_pos - 30, texts["File"])
+
+    # Third column - Base point info
+    canv.setFont("Helvetica-Bold", 11)
+    canv.setFillColor(colors.HexColor("#003366"))
+    canv.drawString(col3, y_pos + 15, "Base Point Information")
+    canv.setFillColor(colors.black)
+    canv.setFont("Helvetica", 10)
+    canv.drawString(col3, y_pos, texts["Base Point"])
+    canv.drawString(col3, y_pos - 15, f"Point Number:")
+
+    # Fourth column - Control check
+    canv.setFont("Helvetica-Bold", 11)
+    canv.setFillColor(colors.HexColor("#003366"))
+    canv.drawString(col4, y_pos + 15, "Control Check")
+    canv.setFillColor(colors.black)
+    canv.setFont("Helvetica", 10)
+    canv.drawString(col4, y_pos, f"Control check:")
+    canv.drawString(col4, y_pos - 15, f"Point Number: 5960890")
+
+    # Fifth column - Additional info
+    canv.setFont("Helvetica-Bold", 11)
+    canv.setFillColor(colors.HexColor("#003366"))
+    canv.drawString(col5, y_pos + 15, "Code Information")
+    canv.setFillColor(colors.black)
+    canv.setFont("Helvetica", 10)
+    canv.drawString(col5, y_pos, texts["Point Number"])
+    canv.drawString(col5, y_pos - 15, texts["Control check"])
+    canv.drawString(col5, y_pos - 30, texts["Score"])
+
+    # Add a line below the header
+    canv.setStrokeColor(colors.HexColor("#003366"))
+    canv.setLineWidth(2)
+    canv.line(40, y_pos - 45, width - 40, y_pos - 45)
+
+    # Footer with page number
+    canv.setFont("Helvetica", 9)
+    canv.setFillColor(colors.HexColor("#003366"))
+    page_text = f"Page {page} of "
+    canv.drawString(_PAGE_NUMBER_X, 20, page_text)
+
+    # The total is only known once the document is complete, see PageCountCanvas
+    canv.saveState()
+    canv.translate(_PAGE_NUMBER_X + canv.stringWidth(page_text, "Helvetica", 9), 20)
+    canv.doForm(PAGE_COUNT_FORM)
+    canv.restoreState()
+
+    # Add timestamp to footer
+    canv.setFont("Helvetica", 8)
+    canv.setFillColor(colors.grey)
+    canv.drawString(40, 20, texts["Generated on"])
+
+    canv.restoreState()
+
+
+def default_report_info(csv_file):
+    """ Default report information used when none is provided. """
+    return {
+        "Project": "Project Name",
+        "Spread": "Spread Info",
+        "File": os.path.basename(csv_file),
+        "Base Point": "Base Point Info",
+        "Point Number": "214 codes",
+        "Control check": "0 Not entered",
+        "Score": "100.00%"
+    }
+
+
+def prepare_report_data(csv_file, chainages):
+    """ Reads a survey CSV and returns the report table with FeatureName, Chainage and Offset. """
     # Read and process CSV data
-    df = pd.read_csv(csv_file, header=None, dtype=str, skiprows=1)
+    # "nan", "NaN" and "None" are already parsed as missing by default, add "NAN"
+    df = pd.read_csv(csv_file, header=None, dtype="string[pyarrow]", skiprows=1, na_values=["NAN"])
     if df.shape[1] < 5:
         raise ValueError(f"CSV file must have at least 5 columns, but found only {df.shape[1]} columns.")
 
-    column_count = df.shape[1]
+    # Every column after the 5 base columns is a feature column
     base_columns = ["Point", "Northing", "Easting", "Elevation", "Description"]
-    feature_columns = [f"Feature_{i}" for i in range(1, column_count - 4 + 1)]
-    existing_feature_columns = feature_columns[:len(df.columns) - 5]
-    df.columns = base_columns + existing_feature_columns
+    feature_columns = [f"Feature_{i}" for i in range(1, df.shape[1] - len(base_columns) + 1)]
+    df.columns = base_columns + feature_columns
 
-    df = df.astype(str).replace(["nan", "NaN", "NAN", "None"], "NA")
+    # Only the text columns the FeatureName is built from need "NA" up front
+    text_columns = ["Description"] + feature_columns
+    df[text_columns] = df[text_columns].fillna("NA")
 
-    # Process feature pairs
-    feature_pairs = []
-    for i in range(0, len(existing_feature_columns), 2):
-        feature1 = existing_feature_columns[i]
-        feature2 = existing_feature_columns[i + 1] if i + 1 < len(existing_feature_columns) else None
+    # Survey codes repeat a lot, so the FeatureName is only built once per distinct
+    # combination of Description and feature values and mapped back by its code
+    codes = pd.MultiIndex.from_frame(df[text_columns]).factorize()[0]
+    unique_text = df[text_columns].iloc[np.unique(codes, return_index=True)[1]]
 
-        feature_value1 = df[feature1].apply(extract_value)
-        feature_value2 = df[feature2].apply(extract_value) if feature2 else pd.Series(["NA"] * len(df))
-
-        feature_pairs.append(feature_value1)
-        if feature2:
-            feature_pairs.append(feature_value2)
+    # Extract feature values column-wise over the whole feature block
+    features = unique_text[feature_columns].apply(extract_value)
 
     # Create FeatureName column
-    df["FeatureName"] = [
-        f"{desc}/{format_feature_name(row)}" if desc != "NA" else format_feature_name(row)
-        for desc, row in zip(df["Description"], zip(*feature_pairs))
-    ]
+    feature_name = format_feature_name(features)
+    description = unique_text["Description"]
+    feature_name = feature_name.where(description.eq("NA"), description + "/" + feature_name)
+    df["FeatureName"] = feature_name.take(codes).set_axis(df.index)
 
     # Calculate chainage and offset
     df["Chainage"] = None
     df["Offset"] = None
-    polyline = data_to_polyline(chainages)
-    df = calculate_chainage_offset(survey_df=df, polyline=polyline)
+    df = calculate_chainage_offset(survey_df=df, polyline=data_to_polyline_index(chainages))
+
+    # Points that could not be matched have no chainage or offset
+    result = df[["Chainage", "Offset"]]
+    df[["Chainage", "Offset"]] = result.astype(object).where(result.notna(), "N/A")
+
+    # Missing base values, the other report columns are already filled
+    numbered_columns = ["Point", "Northing", "Easting", "Elevation"]
+    df[numbered_columns] = df[numbered_columns].fillna("NA")
 
     # Select and organize columns
     df = df[["Point", "Northing", "Easting", "Elevation", "Description", "Chainage", "Offset", "FeatureName"]]
-    df.fillna("N/A", inplace=True)
 
+    return df
+
+
+def render_pdf(df, report_info, output_pdf):
+    """ Renders a table prepared by prepare_report_data to a PDF report. """
     # Increased top margin to prevent header overlay
     top_margin = 150  # Increased from 120
 
     # Set up the document
     doc = SimpleDocTemplate(
         output_pdf,
-        pagesize=landscape(A4),
+        pagesize=PAGE_SIZE,
         leftMargin=40,
         rightMargin=40,
         topMargin=top_margin,  # Increased to make more room for header
-        bottomMargin=40
-    )
-
-    # Create styles for text wrapping
-    styles = getSampleStyleSheet()
-    wrap_style = ParagraphStyle(
-        name="WrapStyle",
-        fontSize=9,
-        leading=12,
-        spaceBefore=1,
-        spaceAfter=1
+        bottomMargin=40,
+        pageCompression=1  # Always compress page content streams
     )
 
-    # Format descriptions for wrapping
-    df["Description"] = df["Description"].apply(lambda x: Paragraph(str(x), wrap_style))
-    df["FeatureName"] = df["FeatureName"].apply(lambda x: Paragraph(str(x), wrap_style))
+    # Format descriptions for wrapping, only values wider than their column become Paragraphs.
+    # Repeated values share one cell object within this table, never across reports
+    df = df.assign(**{
+        column: df[column].map({text: wrap_cell(text, col_width) for text in df[column].unique()})
+        for column, col_width in (("Description", COL_WIDTHS[4]), ("FeatureName", COL_WIDTHS[7]))
+    })
 
-    # Prepare table data
+    # Prepare table data, the cells are already strings, numbers or Paragraphs (no None)
+    # so the table can skip normalizing them cell by cell
     data = [list(df.columns)] + df.values.tolist()
 
-    # Adjust column widths for landscape
-    col_widths = [0.8 * inch, 1.0 * inch, 1.0 * inch, 0.9 * inch, 1.1 * inch, 1.0 * inch, 1.0 * inch, 4.3 * inch]
-
-    # Create table
-    table = Table(data, colWidths=col_widths, repeatRows=1)
-
-    # Define table styles
-    num_align = [('ALIGN', (i, 1), (i, -1), 'RIGHT') for i in [0, 1, 2, 3, 5, 6]]
-    desc_align = [('ALIGN', (4, 1), (4, -1), 'LEFT')]
-    text_align = [('ALIGN', (7, 1), (7, -1), 'LEFT')]
+    # Create table, LongTable keeps splitting the table across pages linear in its length
+    table = LongTable(data, colWidths=COL_WIDTHS, repeatRows=1, normalizedData=1)
+    table.setStyle(TABLE_STYLE)
 
     # Alternate row colors
-    row_colors = []
-    for i in range(1, len(data)):
-        if i % 2 == 0:
-            row_colors.append(('BACKGROUND', (0, i), (-1, i), colors.HexColor("#f5f5f5")))
-
-    # Apply all styles to table
-    table.setStyle(TableStyle([
-                                  ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#003366")),
-                                  ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                                  ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                                  ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                                  ('FONTSIZE', (0, 0), (-1, 0), 10),
-                                  ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                                  ('TOPPADDING', (0, 0), (-1, 0), 12),
-                                  ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                                  ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                                  ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                                  ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                                  ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                                  ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-                                  ('TOPPADDING', (0, 1), (-1, -1), 5),
-                                  ('WORDWRAP', (4, 1), (7, -1)),
-                              ] + num_align + desc_align + text_align + row_colors))
+    table.setStyle([('BACKGROUND', (0, i), (-1, i), _ALT_ROW_COLOR) for i in range(2, len(data), 2)])
 
     # Add elements to document with a spacer at the top for extra buffer
     elements = []
     elements.append(Spacer(1, 10))  # Add a small spacer for extra buffer
     elements.append(table)
 
-    # Build the document with our custom canvas
-    doc.build(elements, canvasmaker=lambda *args, **kwargs: MyCanvas(*args, report_info=report_info, **kwargs))
+    # Build the document, drawing the header and footer on every page
+    on_draw = functools.partial(draw_header_footer, texts=header_texts(report_info))
+    doc.build(elements, onFirstPage=on_draw, onLaterPages=on_draw, canvasmaker=PageCountCanvas)
+
+    return output_pdf
+
+
+# Centerline of the current csv_to_pdf_batch, set once per worker process by _init_worker
+_worker_chainages = None
+
+
+def _init_worker(chainages):
+    global _worker_chainages
+    _worker_chainages = chainages
+
+
+def _csv_to_pdf_worker(job):
+    # Worker entry point for csv_to_pdf_batch, a job is (csv_file, report_info, output_pdf)
+    csv_file, report_info, output_pdf = job
+    return render_pdf(prepare_report_data(csv_file, _worker_chainages), report_info, output_pdf)
+
+
+def csv_to_pdf(csv_file, chainages, output_folder=None, report_info=None):
+    # Default report information if not provided
+    if report_info is None:
+        report_info = default_report_info(csv_file)
+
+    # Ensure output directory exists
+    if output_folder is None:
+        output_folder = os.path.join(os.path.dirname(csv_file), '..', 'output', 'pdf')
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    output_pdf = os.path.join(output_folder, f"Survey_Report_{timestamp}.pdf")
+
+    df = prepare_report_data(csv_file, chainages)
+    render_pdf(df, report_info, output_pdf)
 
     print(f"✅ Official PDF report generated: {output_pdf}")
     return output_pdf
+
+
+def csv_to_pdf_batch(csv_files, chainages, output_folder=None, report_info=None, max_workers=None):
+    """ Converts several CSV files to PDF reports, each one read and rendered in a worker process. """
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+
+    # The polyline is the same for every file, build it once here and hand it to each
+    # worker when it starts, jobs then only carry the file names
+    chainages = data_to_polyline_index(chainages)
+
+    jobs = []
+    used_pdfs = set()
+    for csv_file in csv_files:
+        folder = output_folder
+        if folder is None:
+            folder = os.path.join(os.path.dirname(csv_file), '..', 'output', 'pdf')
+        os.makedirs(folder, exist_ok=True)
+
+        # Files with the same name (from different folders, or the same file twice) would share
+        # one output path, number the later ones
+        name = os.path.splitext(os.path.basename(csv_file))[0]
+        output_pdf = os.path.join(folder, f"Survey_Report_{name}_{timestamp}.pdf")
+        count = 1
+        while os.path.normcase(os.path.abspath(output_pdf)) in used_pdfs:
+            count += 1
+            output_pdf = os.path.join(folder, f"Survey_Report_{name}_{timestamp}_{count}.pdf")
+        used_pdfs.add(os.path.normcase(os.path.abspath(output_pdf)))
+
+        info = report_info if report_info is not None else default_report_info(csv_file)
+        jobs.append((csv_file, info, output_pdf))
+
+    if not jobs:
+        return []
+
+    # Each worker reads and renders whole files, reportlab layout is CPU bound. Workers are
+    # spawned rather than forked, forking after numba's parallel kernel has run is not safe.
+    with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count(), len(jobs)),
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(chainages,)) as executor:
+        output_pdfs = list(executor.map(_csv_to_pdf_worker, jobs))
+
+    for output_pdf in output_pdfs:
+        print(f"✅ Official PDF report generated: {output_pdf}")
+    return output_pdfs
@@ -1,28 +1,147 @@
+import os
+import functools
+from dataclasses import dataclass
+import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
 from shapely.geometry import LineString
 
 
-def data_to_polyline(data):
-    """ Convert a list of objects (database records) into a polyline """
+@dataclass(frozen=True, eq=False)
+class PolylineIndex:
+    """ Polyline with its segment geometry precomputed for chainage/offset lookups """
+    coords: np.ndarray
+    seg_start: np.ndarray
+    seg_vec: np.ndarray
+    seg_len2: np.ndarray
+    seg_len: np.ndarray
+    cum_len: np.ndarray
+    kdtree: cKDTree
+    sample_seg: np.ndarray
+    sample_spacing: float
+
+    @functools.cached_property
+    def polyline(self):
+        # Only built when asked for, the lookups work on the arrays above
+        return LineString(self.coords)
+
+    @classmethod
+    def from_coords(cls, coords):
+        coords = np.ascontiguousarray(coords, dtype=np.float64)
+        if len(coords) < 2:
+            raise ValueError("Polyline needs at least 2 points with Easting/Northing/Chainage")
+        seg_vec = coords[1:] - coords[:-1]
+        seg_len2 = (seg_vec ** 2).sum(1)
+        seg_len = np.sqrt(seg_len2)
+        cum_len = np.concatenate([[0.0], np.cumsum(seg_len)])
+
+        # Sample points along the segments, at most sample_spacing apart, so no part of a segment is
+        # more than sample_spacing / 2 from one of its samples however long the segment is. The
+        # spacing is the typical segment length, kept large enough for ~5 samples per segment at most
+        n_segments = len(seg_len)
+        sample_spacing = max(np.median(seg_len), cum_len[-1] / (4 * n_segments)) if n_segments else 0.0
+        if not sample_spacing > 0:
+            sample_spacing = 1.0
+
+        # A little slack so segments of about the typical length get a single sample
+        sample_spacing *= 1 + 1e-9
+        counts = np.maximum(np.ceil(seg_len / sample_spacing), 1).astype(np.intp)
+        sample_seg = np.repeat(np.arange(n_segments), counts)
+
+        # Each sample sits in the middle of its piece of the segment
+        piece = np.arange(len(sample_seg)) - (np.cumsum(counts) - counts)[sample_seg]
+        fraction = (piece + 0.5) / counts[sample_seg]
+        samples = coords[:-1][sample_seg] + fraction[:, None] * seg_vec[sample_seg]
+
+        # KD-tree over the samples to find candidate segments quickly
+        kdtree = cKDTree(samples, leafsize=32, balanced_tree=False, compact_nodes=False)
+
+        return cls(coords, coords[:-1], seg_vec, seg_len2, seg_len, cum_len, kdtree, sample_seg, sample_spacing)
+
+    @classmethod
+    def from_polyline(cls, polyline):
+        return cls.from_coords(polyline.coords)
+
+
+# Centerline point as read from the records, only what the polyline needs
+_POINT_DTYPE = np.dtype([("Easting", np.float64), ("Northing", np.float64), ("Chainage", np.float64)])
+
+
+def read_chainages_df(chainages_file):
+    """ Read a centerline CSV (Point, Easting, Northing, Chainage, ...) into a typed DataFrame """
+    return pd.read_csv(
+        chainages_file, header=None, skiprows=1, usecols=[0, 1, 2, 3],
+        names=["Point", "Easting", "Northing", "Chainage"],
+        dtype={"Point": str, "Easting": np.float64, "Northing": np.float64, "Chainage": np.float64}
+    )
+
+
+def _polyline_coords(easting, northing, chainage):
+    """ Drop incomplete points and order them by chainage, returns the (N, 2) coordinates """
+    # Remove rows with missing values
+    valid = np.isfinite(easting) & np.isfinite(northing) & np.isfinite(chainage)
+
+    # Ensure chainages are sorted correctly
+    order = chainage[valid].argsort(kind="stable")
+    return np.column_stack([easting[valid][order], northing[valid][order]])
+
 
-    # Convert data to a DataFrame (if it's not already)
-    df = pd.DataFrame(data)
+def _data_coords(data):
+    """ Polyline coordinates of a DataFrame, an (Easting, Northing, Chainage) array or a list of records """
+    if isinstance(data, np.ndarray):
+        points = np.asarray(data, dtype=np.float64)
+        return _polyline_coords(points[:, 0], points[:, 1], points[:, 2])
 
     # Check required columns
     required_columns = {"Point", "Northing", "Easting", "Chainage"}
-    if not required_columns.issubset(df.columns):
+    columns = data.columns if isinstance(data, pd.DataFrame) else set().union(*data)
+    if not required_columns.issubset(columns):
         raise ValueError(f"Data must contain {required_columns} columns")
 
-    # Remove rows with missing values
-    df = df.dropna(subset=["Northing", "Easting", "Chainage"])
+    if isinstance(data, pd.DataFrame):
+        easting, northing, chainage = (
+            data[column].to_numpy(dtype=np.float64) for column in ("Easting", "Northing", "Chainage")
+        )
+    else:
+        # Read the coordinates straight into a float array, missing values become NaN
+        points = np.fromiter(
+            ((record.get("Easting"), record.get("Northing"), record.get("Chainage")) for record in data),
+            dtype=_POINT_DTYPE, count=len(data)
+        )
+        easting, northing, chainage = points["Easting"], points["Northing"], points["Chainage"]
+
+    return _polyline_coords(easting, northing, chainage)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_polyline_index(coords_bytes):
+    return PolylineIndex.from_coords(np.frombuffer(coords_bytes, dtype=np.float64).reshape(-1, 2))
+
+
+def data_to_polyline_index(data):
+    """ Build the PolylineIndex for centerline data (as for data_to_polyline), cached for repeated data """
+    if isinstance(data, PolylineIndex):
+        return data
+
+    # The raw bytes of the cleaned up coordinates are a cheap hashable key, the same
+    # centerline passed again (e.g. once per survey file) reuses its index
+    return _cached_polyline_index(_data_coords(data).tobytes())
+
+
+def data_to_polyline(data):
+    """ Convert a DataFrame, an (Easting, Northing, Chainage) array or a list of records into a polyline """
+    return data_to_polyline_index(data).polyline
 
-    # Ensure chainages are sorted correctly
-    df = df.sort_values(by="Chainage", ascending=True)
 
-    # Create a list of (Easting, Northing) points
-    coordinates = list(zip(df["Easting"], df["Northing"]))
+@functools.lru_cache(maxsize=8)
+def _load_polyline_index(chainages_file, mtime):
+    df = read_chainages_df(chainages_file)
+    return PolylineIndex.from_coords(_polyline_coords(
+        df["Easting"].to_numpy(), df["Northing"].to_numpy(), df["Chainage"].to_numpy()
+    ))
 
-    # Convert into a polyline (LineString)
-    polyline = LineString(coordinates)
 
-    return polyline
+def load_polyline_index(chainages_file):
+    """ Build the PolylineIndex for a centerline CSV, cached until the file changes """
+    chainages_file = os.path.abspath(chainages_file)
+    return _load_polyline_index(chainages_file, os.path.getmtime(chainages_file))